@@ -13,6 +13,18 @@ from pathlib import Path
 from typing import List, Optional, Set
 from emoji_icons import get_icon_html
 
+try:
+    import orjson  # type: ignore
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
 # Путь к файлу, где хранится список клиентов. Используем относительный
 # путь, чтобы файл лежал рядом с запуском приложения.
 CLIENTS_FILE = Path("timur_clients.json")
@@ -41,8 +53,7 @@ def load_clients() -> List[str]:
     """
     if CLIENTS_FILE.exists():
         try:
-            with open(CLIENTS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = _json_loads(CLIENTS_FILE.read_bytes())
             if isinstance(data, list):
                 return [c.lower().strip() for c in data if c.strip()]
         except Exception:
@@ -59,8 +70,7 @@ def save_clients(clients: List[str]) -> None:
     try:
         # Удаляем дубликаты и сортируем
         unique_clients = sorted(list(set(c.lower().strip() for c in clients if c.strip())))
-        with open(CLIENTS_FILE, "w", encoding="utf-8") as f:
-            json.dump(unique_clients, f, ensure_ascii=False, indent=2)
+        CLIENTS_FILE.write_bytes(_json_dumps(unique_clients))
     except Exception as e:
         st.error(f"Ошибка при сохранении списка компаний: {e}")
 
@@ -20,9 +20,9 @@ import pandas as pd
 import numpy as np
 from typing import Optional, Dict, Any
 
-from data_utils import load_sheet_data, parse_company_and_transport, aggregate_company_metrics
+from data_utils import load_sheet_data, parse_company_and_transport, aggregate_company_metrics, clear_sheet_cache
 from clients_manager import edit_clients
-from emoji_icons import get_icon_html
+from emoji_icons import get_icon_html, get_icon_stylesheet
 
 
 # Карта синонимов для сокращённых названий компаний.
@@ -48,6 +48,16 @@ SYNONYMS: Dict[str, str] = {
 def display_dashboard() -> None:
     """Отображает пользовательский интерфейс дашборда."""
     st.set_page_config(page_title="Дашборд по продажам", layout="wide")
+    _dashboard_fragment()
+
+
+@st.fragment
+def _dashboard_fragment() -> None:
+    """Тело дашборда.
+
+    Выполняется как фрагмент: изменение виджетов дашборда перезапускает
+    только эту функцию, а не весь скрипт с вкладкой генератора.
+    """
     st.markdown(f"# {get_icon_html('📊', 32)} Дашборд по продажам топлива", unsafe_allow_html=True)
 
     # Блок настроек: теперь размещаем поля в основном интерфейсе, чтобы они
@@ -73,6 +83,8 @@ def display_dashboard() -> None:
             "Или загрузите Excel‑файл", type=["xlsx", "xlsm", "xls"],
         )
     filter_option = st.radio("Фильтр компаний", options=["Тимур", "Все"], index=0)
+    if st.button("Обновить данные", help="Скачать таблицу заново, не дожидаясь истечения кэша"):
+        clear_sheet_cache()
 
     st.markdown("---")
     st.info("Загрузка данных из источника…")
@@ -241,4 +253,7 @@ def display_dashboard() -> None:
 
 
 if __name__ == "__main__":
+    # При запуске дашборда отдельно стили иконок вставляем здесь
+    # (в общем приложении это делает main.run_app)
+    st.markdown(get_icon_stylesheet(), unsafe_allow_html=True)
     display_dashboard()
\ No newline at end of file
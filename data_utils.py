@@ -23,10 +23,16 @@ from __future__ import annotations
 import io
 import os
 import json
+import re
+import stat
+import tempfile
+import threading
+import warnings
 import datetime as _dt
 from functools import lru_cache
 from typing import Dict, Tuple, Iterable, Optional, Any
 
+import numpy as np
 import pandas as pd
 import requests
 
@@ -54,6 +60,39 @@ except Exception:
     gspread = None  # type: ignore
     Credentials = None  # type: ignore
 
+# orjson разбирает JSON в несколько раз быстрее стандартного модуля; если он
+# не установлен, используется json.loads (оба принимают bytes)
+try:
+    import orjson  # type: ignore
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Для разбора xlsx используем python-calamine (Rust), если он установлен:
+# он в разы быстрее openpyxl и не разбирает листы до обращения к ним.
+# Без него pandas использует движок по умолчанию (openpyxl).
+try:
+    import python_calamine  # type: ignore  # noqa: F401
+    _EXCEL_ENGINE: Optional[str] = 'calamine'
+except ImportError:
+    _EXCEL_ENGINE = None
+
+
+# Каталог приложения: относительно него ищутся словари и шаблоны.
+# Вычисляется один раз при импорте, а не при каждом вызове.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _cache_data(**kwargs: Any):
+    """Возвращает декоратор ``st.cache_data`` или пустой декоратор без Streamlit.
+
+    Позволяет кэшировать результаты между перезапусками скрипта Streamlit,
+    не ломая использование модуля вне Streamlit.
+    """
+    if hasattr(st, 'cache_data'):
+        return st.cache_data(**kwargs)
+    return lambda func: func
+
 
 def load_json_dict(filename: str) -> dict:
     """Загружает словарь из JSON‑файла.
@@ -61,56 +100,225 @@ def load_json_dict(filename: str) -> dict:
     При ошибке чтения или разборе возвращает пустой словарь.
     """
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(filename, 'rb') as f:
+            return _json_loads(f.read())
     except FileNotFoundError:
         return {}
     except json.JSONDecodeError:
         return {}
 
 
+def _lower_keys(data: dict, source: str = 'словарь') -> dict:
+    """Возвращает копию словаря с ключами в нижнем регистре.
+
+    Ключи, различающиеся только регистром (``"Деко"`` и ``"деко"``),
+    совпадают после приведения: остаётся значение последнего из них в
+    порядке файла, а о каждом таком совпадении выдаётся ``UserWarning``.
+    """
+    result: dict = {}
+    original: Dict[str, Any] = {}
+    for key, value in data.items():
+        lowered = str(key).lower()
+        if lowered in result:
+            warnings.warn(
+                f"{source}: ключи '{original[lowered]}' и '{key}' совпадают без учёта "
+                f"регистра, используется значение '{key}'",
+                stacklevel=2,
+            )
+        result[lowered] = value
+        original[lowered] = key
+    return result
+
+
+@lru_cache(maxsize=32)
+def _load_dictionary_cached(filename: str, mtime: float) -> dict:
+    """Читает JSON‑словарь; время изменения файла входит в ключ кэша."""
+    return _lower_keys(load_json_dict(filename), os.path.basename(filename))
+
+
+def _load_dictionary(filename: str) -> dict:
+    """Загружает JSON‑словарь с ключами в нижнем регистре.
+
+    Файл разбирается заново только после его изменения, поэтому повторные
+    вызовы стоят одного ``stat``. Результат общий для всех вызывающих и
+    должен использоваться только для чтения.
+    """
+    try:
+        mtime = os.path.getmtime(filename)
+    except OSError:
+        return {}
+    return _load_dictionary_cached(filename, mtime)
+
+
 def load_dictionaries(base_dir: Optional[str] = None) -> Tuple[dict, dict, dict, dict]:
     """Загружает словари клиентов, товаров, адресов и нефтебаз.
 
     Все словари хранятся в подкаталоге ``json`` относительно ``base_dir``.
     Если ``base_dir`` не указана, используется директория текущего файла.
+    Ключи словарей приводятся к нижнему регистру при загрузке, поэтому при
+    поиске достаточно привести к нижнему регистру только ввод пользователя.
+    Разобранные файлы кэшируются до их изменения (см. ``_load_dictionary``),
+    возвращаемые словари не следует изменять.
 
     Returns:
         tuple(dict, dict, dict, dict): клиенты, продукты, локации, нефтебазы
     """
-    if base_dir is None:
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-    json_dir = os.path.join(base_dir, 'json')
-    clients = load_json_dict(os.path.join(json_dir, 'clients.json'))
-    products = load_json_dict(os.path.join(json_dir, 'products.json'))
-    locations = load_json_dict(os.path.join(json_dir, 'locations.json'))
-    neftebazy = load_json_dict(os.path.join(json_dir, 'nb.json'))
+    json_dir = os.path.join(BASE_DIR if base_dir is None else base_dir, 'json')
+    clients = _load_dictionary(os.path.join(json_dir, 'clients.json'))
+    products = _load_dictionary(os.path.join(json_dir, 'products.json'))
+    locations = _load_dictionary(os.path.join(json_dir, 'locations.json'))
+    neftebazy = _load_dictionary(os.path.join(json_dir, 'nb.json'))
     return clients, products, locations, neftebazy
 
 
+# Названия месяцев для листов Google Sheets; индекс совпадает с номером месяца
+_SHEET_MONTHS = (
+    '', 'ЯНВАРЬ', 'ФЕВРАЛЬ', 'МАРТ', 'АПРЕЛЬ', 'МАЙ', 'ИЮНЬ',
+    'ИЮЛЬ', 'АВГУСТ', 'СЕНТЯБРЬ', 'ОКТЯБРЬ', 'НОЯБРЬ', 'ДЕКАБРЬ'
+)
+
+
 def get_month_sheet_name(month: int, year: int) -> str:
     """Возвращает название листа Google Sheets в формате ``МЕСЯЦ ГОД``.
 
     Использует русские названия месяцев заглавными буквами.
     """
-    months = {
-        1: 'ЯНВАРЬ', 2: 'ФЕВРАЛЬ', 3: 'МАРТ', 4: 'АПРЕЛЬ', 5: 'МАЙ', 6: 'ИЮНЬ',
-        7: 'ИЮЛЬ', 8: 'АВГУСТ', 9: 'СЕНТЯБРЬ', 10: 'ОКТЯБРЬ', 11: 'НОЯБРЬ', 12: 'ДЕКАБРЬ'
-    }
-    return f"{months.get(month, '')} {year}"
+    return f"{_SHEET_MONTHS[month] if 1 <= month <= 12 else ''} {year}"
 
 
-@lru_cache(maxsize=2)
-def _download_google_sheet(sheet_id: str) -> pd.ExcelFile:
-    """Внутренняя функция: скачивает Google Sheets как Excel.
+# Каталог дискового кеша скачанных таблиц. Рядом с каждым ``{sheet_id}.xlsx``
+# лежит ``{sheet_id}.json`` с заголовками ``ETag``/``Last-Modified`` последнего
+# ответа — они используются для условного запроса, чтобы после перезапуска
+# приложения не скачивать неизменившийся файл заново. Каталог свой у каждого
+# пользователя системы: общий /tmp доступен всем.
+SHEET_CACHE_DIR = os.path.join(
+    tempfile.gettempdir(),
+    f"doc-gen-cache-{os.getuid()}" if hasattr(os, 'getuid') else 'doc-gen-cache',
+)
 
-    Используется кеширование, чтобы не загружать файл многократно.
-    При неудаче выбрасывает исключение.
+# Допустимый идентификатор Google Sheets: он подставляется в URL и в имена файлов
+_SHEET_ID_RE = re.compile(r'[A-Za-z0-9_-]+')
+
+# HTTP‑сессии по одной на поток: requests.Session не гарантирует
+# потокобезопасность, а сессии Streamlit выполняются в разных потоках.
+# Внутри потока соединение с docs.google.com переиспользуется между запросами.
+_THREAD_LOCAL = threading.local()
+
+
+def _get_session() -> requests.Session:
+    """Возвращает HTTP‑сессию текущего потока (создаёт её при первом вызове)."""
+    session = getattr(_THREAD_LOCAL, 'session', None)
+    if session is None:
+        session = _THREAD_LOCAL.session = requests.Session()
+    return session
+
+
+def _sheet_cache_dir() -> Optional[str]:
+    """Возвращает каталог дискового кеша или ``None``, если ему нельзя доверять.
+
+    Каталог создаётся с правами 0700. Если он уже существует, но является
+    символической ссылкой, принадлежит другому пользователю или доступен
+    группе/остальным, кеш не используется: подложенным файлам верить нельзя.
     """
+    try:
+        os.makedirs(SHEET_CACHE_DIR, mode=0o700, exist_ok=True)
+        info = os.lstat(SHEET_CACHE_DIR)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(info.st_mode):
+        return None
+    if hasattr(os, 'getuid') and (info.st_uid != os.getuid() or info.st_mode & 0o077):
+        return None
+    return SHEET_CACHE_DIR
+
+
+def _write_file_atomic(path: str, data: bytes) -> None:
+    """Записывает файл через временный файл в том же каталоге и ``os.replace``.
+
+    Прерванная запись (падение процесса, параллельная загрузка) не оставляет
+    на месте ``path`` обрезанный файл.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _fetch_google_sheet_bytes(sheet_id: str) -> bytes:
+    """Скачивает Google Sheets в формате xlsx с учётом дискового кеша.
+
+    Если для таблицы сохранены ``ETag`` или ``Last-Modified``, запрос
+    выполняется условным (``If-None-Match``/``If-Modified-Since``). При
+    ответе ``304 Not Modified`` байты берутся с диска, иначе кеш
+    перезаписывается. Ошибки работы с кешем не мешают загрузке.
+    """
+    if not _SHEET_ID_RE.fullmatch(sheet_id):
+        raise ValueError(f"некорректный идентификатор Google Sheets: {sheet_id!r}")
     url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=xlsx"
-    resp = requests.get(url, timeout=20)
+    cache_dir = _sheet_cache_dir()
+    headers: Dict[str, str] = {}
+    if cache_dir is not None:
+        data_path = os.path.join(cache_dir, f"{sheet_id}.xlsx")
+        meta_path = os.path.join(cache_dir, f"{sheet_id}.json")
+    if cache_dir is not None and os.path.exists(data_path):
+        meta = load_json_dict(meta_path)
+        if not isinstance(meta, dict):
+            # Повреждённый файл заголовков (список, строка, null) — считаем,
+            # что сохранённых заголовков нет, и скачиваем таблицу целиком
+            meta = {}
+        etag, last_modified = meta.get('etag'), meta.get('last_modified')
+        if etag and isinstance(etag, str):
+            headers['If-None-Match'] = etag
+        if last_modified and isinstance(last_modified, str):
+            headers['If-Modified-Since'] = last_modified
+    session = _get_session()
+    resp = session.get(url, headers=headers, timeout=20)
+    if resp.status_code == 304:
+        try:
+            with open(data_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            # Кеш пропал между проверкой и чтением — скачиваем заново
+            resp = session.get(url, timeout=20)
     resp.raise_for_status()
-    return pd.ExcelFile(io.BytesIO(resp.content))
+    content = resp.content
+    if cache_dir is None:
+        return content
+    try:
+        # Сначала убираем старые заголовки: если запись прервётся, следующий
+        # запрос будет безусловным, а не получит 304 к несовпадающему файлу.
+        # Заголовки записываются только после того, как файл данных на месте.
+        try:
+            os.unlink(meta_path)
+        except FileNotFoundError:
+            pass
+        _write_file_atomic(data_path, content)
+        _write_file_atomic(meta_path, json.dumps({
+            'etag': resp.headers.get('ETag'),
+            'last_modified': resp.headers.get('Last-Modified'),
+        }).encode('utf-8'))
+    except OSError:
+        pass
+    return content
+
+
+@_cache_data(ttl=300, show_spinner=False)
+def _download_google_sheet(sheet_id: str) -> bytes:
+    """Внутренняя функция: скачивает Google Sheets как Excel.
+
+    Байты файла кешируются через ``st.cache_data`` на 5 минут (общий кеш
+    для всех сессий и перезапусков скрипта), между перезапусками процесса
+    работает дисковый кеш (см. ``_fetch_google_sheet_bytes``).
+    При неудаче выбрасывает исключение.
+    """
+    return _fetch_google_sheet_bytes(sheet_id)
 
 
 def load_sheet_data(
@@ -130,7 +338,8 @@ def load_sheet_data(
         sheet_id: идентификатор Google Sheets. Если ``file`` не указан, будет предпринята попытка
             скачать файл по ссылке ``export?format=xlsx``.
         date: дата, для которой нужно выбрать лист. По умолчанию используется ``date.today()``.
-        prefer_cache: если ``True``, будет использовано кэшированное значение для Google Sheets.
+        prefer_cache: если ``True``, будет использовано кэшированное значение для Google Sheets
+            (результат разбора хранится в ``st.cache_data`` в течение 5 минут).
 
     Returns:
         tuple(pd.DataFrame, pd.DataFrame, str): датафрейм с заголовками (начиная с 3‑ей строки),
@@ -141,28 +350,65 @@ def load_sheet_data(
     """
     if date is None:
         date = _dt.date.today()
+    if file is None and sheet_id and prefer_cache:
+        return _load_google_sheet_data_cached(sheet_id, date)
+    return _read_sheet_data(file=file, sheet_id=sheet_id, date=date, prefer_cache=prefer_cache)
+
+
+@_cache_data(ttl=300, show_spinner=False)
+def _load_google_sheet_data_cached(sheet_id: str, date: _dt.date) -> Tuple[pd.DataFrame, pd.DataFrame, str]:
+    """Кэшируемый вариант ``load_sheet_data`` для загрузки по ``sheet_id``.
+
+    Загруженные через uploader файлы не кэшируются: их содержимое меняется
+    от запуска к запуску, а хэширование байтов стоит почти как сам разбор.
+    """
+    return _read_sheet_data(sheet_id=sheet_id, date=date, prefer_cache=True)
+
+
+def clear_sheet_cache() -> None:
+    """Сбрасывает кэш скачанных и разобранных Google Sheets.
+
+    Дисковый кеш не удаляется: следующий запрос будет условным и скачает
+    файл заново, только если таблица изменилась.
+    """
+    for func in (_download_google_sheet, _load_google_sheet_data_cached):
+        clear = getattr(func, 'clear', None)
+        if clear is not None:
+            clear()
+
+
+def _read_sheet_data(
+    *,
+    file: Optional[Any] = None,
+    sheet_id: Optional[str] = None,
+    date: _dt.date,
+    prefer_cache: bool = True
+) -> Tuple[pd.DataFrame, pd.DataFrame, str]:
+    """Внутренняя функция: читает лист за месяц без кэширования Streamlit.
+
+    Параметры и результат совпадают с ``load_sheet_data``.
+    """
     sheet_name = get_month_sheet_name(date.month, date.year)
     excel_file: Optional[pd.ExcelFile] = None
     # Определяем источник данных
     if file is not None:
         # Загруженный файл может быть либо ``UploadedFile`` от Streamlit, либо bytes
         try:
-            excel_file = pd.ExcelFile(file)
+            excel_file = pd.ExcelFile(file, engine=_EXCEL_ENGINE)
         except Exception as exc:
             raise RuntimeError(f"Ошибка чтения загруженного файла: {exc}")
     elif sheet_id:
+        if not _SHEET_ID_RE.fullmatch(sheet_id):
+            raise RuntimeError(f"Некорректный идентификатор Google Sheets: {sheet_id!r}")
         # Пытаемся скачать Google Sheets как Excel. Если таблица приватна, то
         # прямой доступ может завершиться ошибкой.
         excel_file = None  # type: Optional[pd.ExcelFile]
         download_exc: Optional[Exception] = None
         try:
             if prefer_cache:
-                excel_file = _download_google_sheet(sheet_id)
+                excel_file = pd.ExcelFile(io.BytesIO(_download_google_sheet(sheet_id)), engine=_EXCEL_ENGINE)
             else:
-                url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=xlsx"
-                resp = requests.get(url, timeout=20)
-                resp.raise_for_status()
-                excel_file = pd.ExcelFile(io.BytesIO(resp.content))
+                excel_file = pd.ExcelFile(io.BytesIO(_fetch_google_sheet_bytes(sheet_id)), engine=_EXCEL_ENGINE)
         except Exception as exc:
             # Перехватываем исключение, но не выходим сразу — возможно
             # получится загрузить таблицу другим способом.
@@ -173,7 +419,7 @@ def load_sheet_data(
             local_path = f"{sheet_id}.xlsx"
             if os.path.exists(local_path):
                 try:
-                    excel_file = pd.ExcelFile(local_path)
+                    excel_file = pd.ExcelFile(local_path, engine=_EXCEL_ENGINE)
                 except Exception:
                     excel_file = None
         # Если локального файла нет или он не читается, пробуем загрузить
@@ -193,7 +439,10 @@ def load_sheet_data(
                     creds = Credentials.from_service_account_info(dict(creds_info), scopes=scopes)
                     gc = gspread.authorize(creds)
                     sh = gc.open_by_key(sheet_id)
-                    sheet_names = [ws.title for ws in sh.worksheets()]
+                    # Список листов запрашивается один раз: по нему же
+                    # берётся нужный лист без повторного обращения к API
+                    worksheets = {ws.title: ws for ws in sh.worksheets()}
+                    sheet_names = worksheets
                     target_sheet = sheet_name
                     if target_sheet not in sheet_names:
                         # если лист за текущий месяц отсутствует — пробуем предыдущий
@@ -204,8 +453,7 @@ def load_sheet_data(
                             target_sheet = alt_sheet
                         else:
                             raise RuntimeError("Лист для текущего или предыдущего месяца не найден в Google Sheets")
-                    worksheet = sh.worksheet(target_sheet)
-                    values = worksheet.get_all_values()
+                    values = worksheets[target_sheet].get_all_values()
                     df_raw = pd.DataFrame(values)
                     if df_raw.shape[0] < 3:
                         raise RuntimeError("Недостаточно строк в Google Sheet для определения заголовков")
@@ -223,18 +471,32 @@ def load_sheet_data(
             raise RuntimeError(err_msg)
     else:
         raise RuntimeError("Не указан источник данных: требуется файл или sheet_id")
-    # Если мы дошли до этого места, excel_file определён и содержит данные
+    # Если мы дошли до этого места, excel_file определён и содержит данные.
+    # Книга не разбирается целиком: ExcelFile читает только список листов,
+    # а read_excel ниже — единственный нужный лист.
+    with excel_file:
+        return _read_month_sheet(excel_file, sheet_name, date)
+
+
+def _read_month_sheet(
+    excel_file: pd.ExcelFile, sheet_name: str, date: _dt.date
+) -> Tuple[pd.DataFrame, pd.DataFrame, str]:
+    """Выбирает лист за месяц (или предыдущий) в открытой книге и читает его."""
     target_sheet = sheet_name
-    if target_sheet not in excel_file.sheet_names:
+    sheet_names = excel_file.sheet_names
+    if target_sheet not in sheet_names:
         # переходим к предыдущему месяцу
         prev_month = date.month - 1 or 12
         prev_year = date.year if date.month > 1 else date.year - 1
         alt_sheet = get_month_sheet_name(prev_month, prev_year)
-        if alt_sheet in excel_file.sheet_names:
+        if alt_sheet in sheet_names:
             target_sheet = alt_sheet
         else:
             raise RuntimeError("Лист для текущего или предыдущего месяца не найден")
-    # Читаем данные: строка с индексом 2 содержит заголовки
+    # Читаем данные: строка с индексом 2 содержит заголовки. Книга уже
+    # открыта, повторно разбирается только лист; собрать таблицу с
+    # заголовками из «сырого» листа нельзя без потери типов (в нём целые
+    # столбцы уже стали float, а числовой заголовок 2025 — 2025.0)
     try:
         df_month = pd.read_excel(excel_file, sheet_name=target_sheet, header=2)
     except Exception as exc:
@@ -243,12 +505,29 @@ def load_sheet_data(
     return df_month, df_raw, target_sheet
 
 
+def _stripped_strings(values: pd.Series) -> pd.Series:
+    """Возвращает строковые значения без пробелов по краям (``NA`` для нестроковых)."""
+    return values.where(values.map(lambda v: isinstance(v, str))).astype('string').str.strip()
+
+
+def _first_token_lower(values: pd.Series) -> pd.Series:
+    """Возвращает первое слово каждой строки в нижнем регистре.
+
+    Для пустых и нестроковых значений результат — ``NA``. Используется для
+    получения фамилии водителя из ячеек вида ``Сулейманов Дамир ...``.
+    Регистр понижается до разбиения, а результат снова приводится к типу
+    ``string``: если все значения пустые, ``.str.get(0)`` возвращает
+    столбец из NaN типа float, и дальнейший ``.str`` упал бы.
+    """
+    return _stripped_strings(values).str.lower().str.split(n=1).str.get(0).astype('string')
+
+
 def parse_transport_table(sheet_df: pd.DataFrame) -> Dict[str, float]:
     """Разбирает блок "ТРАНСПОРТ +" в таблице.
 
     Возвращает словарь вида ``{фамилия: сумма}`` для фамилий водителей, встречающихся
-    в блоке «ТРАНСПОРТ +». Суммы берутся из столбца T (index=19) или 25, если
-    в T пусто. В таблице фамилия и сумма могут быть записаны в виде ``Сулейманов Дамир ...``.
+    в блоке «ТРАНСПОРТ +». Сумма — произведение тарифа (столбец H, index=7) на массу
+    (столбец O, index=14). В таблице фамилия может быть записана в виде ``Сулейманов Дамир ...``.
 
     Args:
         sheet_df: датафрейм листа, прочитанный без заголовков (header=None).
@@ -256,39 +535,37 @@ def parse_transport_table(sheet_df: pd.DataFrame) -> Dict[str, float]:
     Returns:
         dict: ключ — фамилия в нижнем регистре, значение — абсолютное число затрат.
     """
-    transport_map: Dict[str, float] = {}
-    # Находим начало блока по строке, содержащей «ТРАНСПОРТ»
-    start_indices = sheet_df.index[sheet_df[0].astype(str).str.contains('ТРАНСПОРТ', case=False, na=False)]
-    if len(start_indices) == 0:
-        return transport_map
-    start_idx = int(start_indices[0]) + 1
-    for i in range(start_idx, sheet_df.shape[0]):
-        name_val = sheet_df.at[i, 0]
-        # Если строка пустая, пропускаем её, так как таблица может содержать разрывы
-        if pd.isna(name_val) or str(name_val).strip() == '':
-            continue
-        name_str = str(name_val).strip()
-        # Блок заканчивается на строках «ВСЕГО» или «ИТОГО»
-        if name_str.upper() in ['ВСЕГО', 'ИТОГО']:
-            break
-        # Тариф находится в колонке H (index 7), масса – в колонке O (index 14)
-        tariff = sheet_df.at[i, 7]
-        mass = sheet_df.at[i, 14] if sheet_df.shape[1] > 14 else None
-        try:
-            numeric_tariff = float(tariff) if pd.notna(tariff) else 0.0
-        except Exception:
-            numeric_tariff = 0.0
-        try:
-            numeric_mass = float(mass) if pd.notna(mass) else 0.0
-        except Exception:
-            numeric_mass = 0.0
-        cost = numeric_tariff * numeric_mass
-        surname = name_str.split()[0].lower() if name_str else ''
-        if surname:
-            transport_map[surname] = cost
-    return transport_map
+    # Находим начало блока по первой строке, содержащей «ТРАНСПОРТ»: маркер
+    # ищется простым перебором до первого совпадения, без regex по всему столбцу
+    start_pos = next(
+        (pos for pos, val in enumerate(sheet_df[0].to_numpy())
+         if isinstance(val, str) and 'транспорт' in val.lower()),
+        None,
+    )
+    if start_pos is None:
+        return {}
+    block = sheet_df.iloc[start_pos + 1:]
+    names = block[0]
+    names_str = names.astype(str).str.strip()
+    # Пустые строки пропускаем, так как таблица может содержать разрывы
+    filled = (names.notna() & (names_str != '')).to_numpy()
+    # Блок заканчивается на строках «ВСЕГО» или «ИТОГО»
+    stop_positions = np.flatnonzero(filled & names_str.str.upper().isin(['ВСЕГО', 'ИТОГО']).to_numpy())
+    end = stop_positions[0] if len(stop_positions) else len(block)
+    rows = filled[:end]
+    # Тариф находится в колонке H (index 7), масса – в колонке O (index 14)
+    tariff = pd.to_numeric(block[7].iloc[:end], errors='coerce').fillna(0.0).to_numpy()
+    if sheet_df.shape[1] > 14:
+        mass = pd.to_numeric(block[14].iloc[:end], errors='coerce').fillna(0.0).to_numpy()
+    else:
+        mass = np.zeros(end)
+    cost = tariff * mass
+    surnames = _first_token_lower(names_str.iloc[:end]).to_numpy()
+    # При повторе фамилии остаётся последнее значение, как и раньше
+    return {surname: float(c) for surname, c in zip(surnames[rows], cost[rows])}
 
 
+@_cache_data(ttl=300, show_spinner=False)
 def prepare_dashboard_summary(
     df: pd.DataFrame,
     clients_dict: Dict[str, Any],
@@ -309,70 +586,89 @@ def prepare_dashboard_summary(
         tuple(list, dict): список словарей по компаниям и общий итоговый словарь с
             ключами ``total_volume``, ``total_profit`` и ``total_transport``.
     """
-    df = df.copy()
+    # Берём только нужные для сводки столбцы, чтобы не копировать весь лист
+    df = df[[
+        'Компания',
+        'Данные водителя, а/м, п/п и контактные сведения',
+        '№ доп контрагент',
+        'кол-во отгруженного, тн',
+        'Итого заработали',
+        'отсрочка платежа, дн',
+        'Оплачено контрагентом',
+    ]].copy()
+    # Числа из выгрузки могут прийти как object (текст в ячейках): приводим
+    # их к float один раз, чтобы суммы и сравнения ниже шли по числовым столбцам
+    for col in ('№ доп контрагент', 'кол-во отгруженного, тн', 'Итого заработали', 'отсрочка платежа, дн'):
+        df[col] = pd.to_numeric(df[col], errors='coerce')
     # нормализуем названия компаний для поиска
-    df['company_key'] = df['Компания'].astype(str).str.lower().str.strip()
+    # категориальный тип: isin и сравнения идут по целочисленным кодам
+    df['company_key'] = df['Компания'].astype(str).str.lower().str.strip().astype('category')
     df_clients = df[df['company_key'].isin(clients_dict.keys())]
-    summary: list = []
-    total_volume = 0.0
-    total_profit = 0.0
-    transport_total = 0.0
-    # Фамилии водителей, встречающиеся в сделках
-    surnames_in_deals: set[str] = set()
-    for _, row in df_clients.iterrows():
-        drv_info = row.get('Данные водителя, а/м, п/п и контактные сведения')
-        if isinstance(drv_info, str) and drv_info.strip():
-            surnames_in_deals.add(drv_info.strip().split()[0].lower())
-    # Суммируем транспортные расходы по найденным фамилиям
-    for s in surnames_in_deals:
-        if s in transport_map:
-            transport_total += transport_map[s]
-    # Группируем по каждой компании
-    for comp_key in sorted(df_clients['company_key'].unique()):
-        comp_df = df_clients[df_clients['company_key'] == comp_key]
-        # Последний номер доп. соглашения
-        try:
-            last_num = int(comp_df['№ доп контрагент'].dropna().astype(int).max())
-        except Exception:
-            last_num = None
-        vol_sum = comp_df['кол-во отгруженного, тн'].fillna(0).sum()
-        prof_sum = comp_df['Итого заработали'].fillna(0).sum()
-        total_volume += vol_sum
-        total_profit += prof_sum
-        driver_missing = comp_df['Данные водителя, а/м, п/п и контактные сведения'].isna().any() or \
-            (comp_df['Данные водителя, а/м, п/п и контактные сведения'].astype(str).str.strip() == '').any()
-        # Существуют ли сделки с отсрочкой, где еще не оплачено
-        pending = comp_df[(comp_df['отсрочка платежа, дн'].fillna(0) >= 1) & (comp_df['Оплачено контрагентом'].isna())]
-        max_defer_days = int(pending['отсрочка платежа, дн'].max()) if not pending.empty else None
-        # Транспортные расходы конкретной компании
-        comp_transport = 0.0
-        comp_surnames: set[str] = set()
-        for drv in comp_df['Данные водителя, а/м, п/п и контактные сведения']:
-            if isinstance(drv, str) and drv.strip():
-                comp_surnames.add(drv.strip().split()[0].lower())
-        for sn in comp_surnames:
-            if sn in transport_map:
-                comp_transport += transport_map[sn]
-        summary.append({
+    drv_col = 'Данные водителя, а/м, п/п и контактные сведения'
+    defer_col = 'отсрочка платежа, дн'
+    # Фамилия водителя — первое слово ячейки (иначе NA); очищенный текст
+    # нужен ещё и для признака отсутствия водителя
+    drivers = df_clients[drv_col]
+    driver_text = _stripped_strings(drivers)
+    surnames = _first_token_lower(drivers)
+    # Признаки по строкам считаем один раз для всей таблицы, а затем
+    # агрегируем их по компаниям через groupby
+    df_clients = df_clients.assign(
+        _volume=df_clients['кол-во отгруженного, тн'].fillna(0),
+        _profit=df_clients['Итого заработали'].fillna(0),
+        _last_num=df_clients['№ доп контрагент'],
+        _driver_missing=drivers.isna() | driver_text.eq('').fillna(False),
+        # Отсрочка по сделкам, которые ещё не оплачены (иначе NaN)
+        _pending_defer=df_clients[defer_col].where(
+            (df_clients[defer_col].fillna(0) >= 1) & df_clients['Оплачено контрагентом'].isna()
+        ),
+        _surname=surnames,
+    )
+    company_stats = df_clients.groupby('company_key', observed=True).agg(
+        last_num=('_last_num', 'max'),
+        vol_sum=('_volume', 'sum'),
+        prof_sum=('_profit', 'sum'),
+        driver_missing=('_driver_missing', 'any'),
+        max_defer=('_pending_defer', 'max'),
+    )
+    # Транспортные расходы: каждая фамилия учитывается один раз — в целом
+    # по сделкам и отдельно в рамках каждой компании
+    unique_surnames = pd.Series(df_clients['_surname'].dropna().unique(), dtype=object)
+    transport_total = float(unique_surnames.map(transport_map).fillna(0).sum())
+    company_surnames = df_clients[['company_key', '_surname']].dropna().drop_duplicates()
+    company_transport = (
+        company_surnames['_surname'].astype(object).map(transport_map).fillna(0)
+        .groupby(company_surnames['company_key'], observed=True).sum()
+    )
+    company_stats['transport'] = company_transport.reindex(company_stats.index, fill_value=0.0)
+    summary: list = [
+        {
             'Компания': comp_key,
-            'Последний № ДС': last_num,
-            'Всего отгружено, тн': round(vol_sum, 3),
-            'Всего заработано': round(prof_sum, 2),
-            'Водитель отсутствует': driver_missing,
-            'Отсрочка, дн': max_defer_days,
-            'Транспортные расходы': round(comp_transport, 2)
-        })
+            'Последний № ДС': int(row.last_num) if pd.notna(row.last_num) else None,
+            'Всего отгружено, тн': round(row.vol_sum, 3),
+            'Всего заработано': round(row.prof_sum, 2),
+            'Водитель отсутствует': bool(row.driver_missing),
+            'Отсрочка, дн': int(row.max_defer) if pd.notna(row.max_defer) else None,
+            'Транспортные расходы': round(float(row.transport), 2),
+        }
+        for comp_key, row in zip(company_stats.index, company_stats.itertuples(index=False))
+    ]
     totals = {
-        'total_volume': round(total_volume, 3),
-        'total_profit': round(total_profit, 2),
+        'total_volume': round(company_stats['vol_sum'].sum(), 3),
+        'total_profit': round(company_stats['prof_sum'].sum(), 2),
         'total_transport': round(transport_total, 2)
     }
     return summary, totals
 
 
+@_cache_data(ttl=300, show_spinner=False)
 def parse_company_and_transport(df_raw: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """Парсит данные по компаниям и таблицу «ТРАНСПОРТ +» из необработанного датафрейма.
 
+    Результат кэшируется по содержимому ``df_raw``: хэширование листа
+    занимает единицы миллисекунд против сотен для построчного разбора,
+    поэтому перезапуски дашборда с теми же данными разбор не повторяют.
+
     В Google Sheets данные организованы таким образом:
 
     * Колонка A содержит названия компаний, начиная с 3‑ей строки (индекс 2).
@@ -423,12 +719,13 @@ def parse_company_and_transport(df_raw: pd.DataFrame) -> Tuple[pd.DataFrame, pd.
     # Определяем границы таблицы транспорта
     transport_start: Optional[int] = None
     transport_end: Optional[int] = None
-    # Ищем строку с маркером «ТРАНСПОРТ +»
-    for i, row in df_raw.iterrows():
-        a_val = str(row.iloc[idx_company]) if idx_company < len(row) else ""
-        if a_val.strip().upper() == "ТРАНСПОРТ +":
-            transport_start = i
-            break
+    # Ищем строку с маркером «ТРАНСПОРТ +» (перебираем только столбец A,
+    # не создавая Series для каждой строки)
+    if idx_company < df_raw.shape[1]:
+        for i, a_val in zip(df_raw.index, df_raw.iloc[:, idx_company]):
+            if str(a_val).strip().upper() == "ТРАНСПОРТ +":
+                transport_start = i
+                break
     # Если начало найдено, ищем конец — строку, начинающуюся с «Трансп»
     if transport_start is not None:
         for j in range(transport_start + 1, len(df_raw)):
@@ -584,8 +881,8 @@ def aggregate_company_metrics(
     if 'company' not in sales_df.columns:
         raise ValueError("DataFrame sales_df должен содержать колонку 'company'")
     
-    # Копия исходных данных
-    df = sales_df.copy()
+    # Копия только тех столбцов, которые участвуют в расчётах
+    df = sales_df[['company', 'driver_info', 'tonnage', 'profit', 'price_per_ton', 'paid', 'row_number']].copy()
     # Нормализуем названия компаний
     df['company_lower'] = df['company'].astype(str).str.lower().str.strip()
     # Применяем словарь синонимов (если предоставлен)
@@ -593,6 +890,8 @@ def aggregate_company_metrics(
         df['company_mapped'] = df['company_lower'].apply(lambda x: synonyms.get(x, x))
     else:
         df['company_mapped'] = df['company_lower']
+    # Категориальный тип ускоряет фильтрацию и группировку по компании
+    df['company_mapped'] = df['company_mapped'].astype('category')
     # Фильтруем по списку компаний
     if company_filter is not None:
         filter_set = {c.lower() for c in company_filter}
@@ -607,34 +906,36 @@ def aggregate_company_metrics(
     # чтобы избежать двойного использования одной и той же записи.
     transport_lookup: Dict[Tuple[str, float], list] = {}
     if not transport_df.empty:
-        # нормализуем фамилии и округляем тоннаж до трёх знаков для сопоставления
-        transport_df['surname_lower'] = transport_df['surname'].astype(str).str.lower().str.strip()
-        for _, trow in transport_df.iterrows():
+        # округляем тоннаж до трёх знаков для сопоставления; столбцы
+        # перебираются через zip, без построения Series на каждую строку
+        for t_surname, t_tonnage, t_cost in zip(
+            transport_df['surname_lower'], transport_df['tonnage'], transport_df['cost']
+        ):
             try:
-                t_surname = trow['surname_lower']
-                t_tonnage = float(trow['tonnage'])
-                t_cost = float(trow['cost'])
+                key = (t_surname, round(float(t_tonnage), 3))
+                cost_value = float(t_cost)
             except Exception:
                 continue
-            key = (t_surname, round(t_tonnage, 3))
-            transport_lookup.setdefault(key, []).append(t_cost)
+            transport_lookup.setdefault(key, []).append(cost_value)
     # Считаем стоимость услуги для каждой строки продаж
-    def match_transport_cost(row: pd.Series) -> float:
+    def match_transport_cost(driver: Any, ton: Any) -> float:
         """Находит стоимость услуги для строки продаж, используя фамилию
         водителя и тоннаж. Использует словарь transport_lookup, где каждая
         запись используется не более одного раза."""
-        driver = row.get('driver_info')
-        ton = row.get('tonnage')
         if not isinstance(driver, str) or not driver.strip() or not pd.notna(ton):
             return 0.0
         surname = driver.strip().split()[0].lower()
         key = (surname, round(float(ton), 3))
         cost_list = transport_lookup.get(key)
-        if cost_list and len(cost_list) > 0:
+        if cost_list:
             # Возвращаем и удаляем первую найденную стоимость
             return float(cost_list.pop(0))
         return 0.0
-    df['transport_cost'] = df.apply(match_transport_cost, axis=1)
+    # Строки обрабатываются по порядку: от него зависит, какой строке
+    # продаж достанется запись перевозки при совпадающих ключах
+    df['transport_cost'] = [
+        match_transport_cost(driver, ton) for driver, ton in zip(df['driver_info'], df['tonnage'])
+    ]
     # Вычисляем чистую прибыль: profit - transport_cost
     # Чистая прибыль = прибыль - транспортные расходы
     df['net_profit'] = (
@@ -654,7 +955,7 @@ def aggregate_company_metrics(
         return float(amount)
     df['debt'] = df.apply(calc_debt, axis=1)
     # Агрегация по компаниям
-    grouped = df.groupby('company_mapped').agg(
+    grouped = df.groupby('company_mapped', observed=True).agg(
         company=('company', 'first'),
         tonnage=('tonnage', 'sum'),
         profit=('profit', 'sum'),
@@ -668,9 +969,10 @@ def aggregate_company_metrics(
     # Сводка задолженности/переплат
     debt_table = grouped[['company', 'debt']].copy()
     # Строки, требующие внимания (тоннаж <= 0 или NaN)
-    attention_df = df[(df['tonnage'].isna()) | (df['tonnage'] <= 0)].copy()
+    # (булева индексация уже возвращает новый датафрейм, копия не нужна)
+    attention_df = df[(df['tonnage'].isna()) | (df['tonnage'] <= 0)]
     # Строки без указания водителя
-    missing_driver_df = df[df['driver_info'].isna() | (df['driver_info'].astype(str).str.strip() == '')].copy()
+    missing_driver_df = df[df['driver_info'].isna() | (df['driver_info'].astype(str).str.strip() == '')]
     return {
         'summary': grouped,
         'debt_table': debt_table,
@@ -0,0 +1,44 @@
+"""
+Общие данные об иконках, заменяющих emoji.
+
+Единственный источник соответствия emoji и имени иконки: из него
+строятся имена SVG‑файлов в ``emoji_icons`` и имена файлов в
+скриптах генерации иконок.
+"""
+
+# Маппинг emoji на имя иконки (без расширения)
+EMOJI_TO_NAME = {
+    "📊": "chart",
+    "⚙️": "settings",
+    "✅": "checkmark",
+    "❌": "cross",
+    "📦": "package",
+    "💸": "money",
+    "🚫": "prohibited",
+    "🔄": "refresh",
+    "🧾": "receipt",
+    "💾": "save",
+    "📝": "memo",
+    "📄": "document",
+    "ℹ️": "info",
+    "📌": "pin",
+    "🚚": "truck",
+    "📍": "location",
+    "🛢️": "oil_barrel",
+    "🏠": "house",
+    "⬇️": "download",
+    "🚀": "rocket",
+    "📁": "folder",
+    "🛠": "tools",
+    "🎯": "target",
+    "📋": "clipboard",
+    "⚠️": "warning",
+    "📈": "chart_up",
+    "🔒": "lock",
+    "🎨": "paintbrush",
+    "📱": "mobile",
+    "📞": "phone",
+    "📑": "pdf",
+    "⏳": "clock",
+    "🚨": "alarm",
+}
@@ -1,72 +1,65 @@
 """
 Вспомогательный модуль для работы с иконками вместо emoji.
+
+Иконки выводятся как ``<span class="emi-...">``: сами SVG (в виде data URI)
+попадают на страницу один раз — в таблице стилей ``get_icon_stylesheet``,
+которую приложение вставляет через ``st.markdown`` в начале отрисовки.
 """
 
-import base64
+from functools import lru_cache
 from pathlib import Path
+from urllib.parse import quote
+
+from emoji_data import EMOJI_TO_NAME
 
 # Базовый путь к иконкам
 ICONS_BASE_PATH = Path("assets/icons/emoji")
 
 # Маппинг emoji на имена файлов иконок
-EMOJI_TO_ICON = {
-    "📊": "chart.svg",
-    "⚙️": "settings.svg",
-    "✅": "checkmark.svg",
-    "❌": "cross.svg",
-    "📦": "package.svg",
-    "💸": "money.svg",
-    "🚫": "prohibited.svg",
-    "🔄": "refresh.svg",
-    "🧾": "receipt.svg",
-    "💾": "save.svg",
-    "📝": "memo.svg",
-    "📄": "document.svg",
-    "ℹ️": "info.svg",
-    "📌": "pin.svg",
-    "🚚": "truck.svg",
-    "📍": "location.svg",
-    "🛢️": "oil_barrel.svg",
-    "🏠": "house.svg",
-    "⬇️": "download.svg",
-    "🚀": "rocket.svg",
-    "📁": "folder.svg",
-    "🛠": "tools.svg",
-    "🎯": "target.svg",
-    "📋": "clipboard.svg",
-    "⚠️": "warning.svg",
-    "📈": "chart_up.svg",
-    "🔒": "lock.svg",
-    "🎨": "paintbrush.svg",
-    "📱": "mobile.svg",
-    "📞": "phone.svg",
-    "📑": "pdf.svg",
-    "⏳": "clock.svg",
-    "🚨": "alarm.svg",
-}
-
-# Кэш для base64 закодированных SVG
-_icon_cache = {}
-
-def _load_icon_base64(icon_file: str) -> str:
-    """Загружает SVG файл и кодирует его в base64."""
-    if icon_file in _icon_cache:
-        return _icon_cache[icon_file]
-    
+EMOJI_TO_ICON = {emoji: f"{name}.svg" for emoji, name in EMOJI_TO_NAME.items()}
+
+def _read_data_uri(icon_file: str) -> str:
+    """Читает SVG файл и возвращает его как data URI (None, если файла нет).
+
+    SVG — текст, поэтому вместо base64 (+33% к размеру) он экранируется для
+    URL. Пробельные символы схлопываются, а двойные кавычки заменяются на
+    одинарные: так экранировать приходится только ``<``, ``>`` и ``#``.
+    """
     icon_path = ICONS_BASE_PATH / icon_file
     if not icon_path.exists():
         return None
-    
-    try:
-        with open(icon_path, "rb") as f:
-            svg_content = f.read()
-            base64_content = base64.b64encode(svg_content).decode("utf-8")
-            data_uri = f"data:image/svg+xml;base64,{base64_content}"
-            _icon_cache[icon_file] = data_uri
-            return data_uri
-    except Exception:
-        return None
+    svg = " ".join(icon_path.read_text(encoding="utf-8").split()).replace('"', "'")
+    return "data:image/svg+xml;utf8," + quote(svg, safe=" /=:,;-._()'")
+
+# Data URI всех иконок кодируются один раз при импорте модуля: набор иконок
+# небольшой и заранее известен, поэтому при отрисовке остаётся только поиск в словаре.
+# После импорта словарь только читается, поэтому его можно без блокировок
+# использовать из потоков разных сессий Streamlit (lru_cache ниже тоже потокобезопасен).
+_DATA_URIS = {emoji: _read_data_uri(icon_file) for emoji, icon_file in EMOJI_TO_ICON.items()}
 
+# Набор иконок и размеров ограничен, поэтому результаты функций ниже
+# кэшируются целиком: Streamlit вызывает их заново при каждом перезапуске скрипта.
+# Модуль импортируется один раз на процесс, так что lru_cache сохраняется между
+# перезапусками; st.cache_data здесь только добавил бы хэширование аргументов и
+# копирование результата при каждом обращении.
+
+@lru_cache(maxsize=None)
+def get_icon_stylesheet() -> str:
+    """Возвращает блок ``<style>`` с классами ``emi-<имя>`` для всех иконок."""
+    rules = "".join(
+        f'.emi-{EMOJI_TO_NAME[emoji]}{{background-image:url("{data_uri}")}}'
+        for emoji, data_uri in _DATA_URIS.items()
+        if data_uri
+    )
+    return (
+        "<style>"
+        "[class^='emi-']{display:inline-block;vertical-align:middle;margin-right:4px;"
+        "background-position:center;background-repeat:no-repeat;background-size:contain;"
+        "image-rendering:-webkit-optimize-contrast;image-rendering:crisp-edges;}"
+        f"{rules}</style>"
+    )
+
+@lru_cache(maxsize=None)
 def get_icon_path(emoji: str) -> str:
     """Возвращает путь к иконке для данного emoji."""
     icon_file = EMOJI_TO_ICON.get(emoji)
@@ -74,16 +67,16 @@ def get_icon_path(emoji: str) -> str:
         return str(ICONS_BASE_PATH / icon_file)
     return None
 
+@lru_cache(maxsize=None)
 def get_icon_html(emoji: str, size: int = 20, alt: str = None) -> str:
-    """Возвращает HTML тег <img> для emoji с base64 кодированием."""
-    icon_file = EMOJI_TO_ICON.get(emoji)
-    if not icon_file:
+    """Возвращает HTML элемент иконки для emoji.
+
+    Изображение задаётся классом из ``get_icon_stylesheet``, поэтому таблица
+    стилей должна быть вставлена на страницу.
+    """
+    if not _DATA_URIS.get(emoji):
         return emoji  # Fallback на emoji, если иконка не найдена
     
-    data_uri = _load_icon_base64(icon_file)
-    if not data_uri:
-        return emoji  # Fallback на emoji, если не удалось загрузить
-    
     if alt is None:
         alt = f"emoji: {emoji}"
     
@@ -91,8 +84,9 @@ def get_icon_html(emoji: str, size: int = 20, alt: str = None) -> str:
     # Минимальный размер 20px (соответствует шрифту ~14px)
     actual_size = max(size, 20)
     
-    return f'<img src="{data_uri}" alt="{alt}" width="{actual_size}" height="{actual_size}" style="vertical-align: middle; display: inline-block; margin-right: 4px; object-fit: contain; image-rendering: -webkit-optimize-contrast; image-rendering: crisp-edges;">'
+    return f'<span class="emi-{EMOJI_TO_NAME[emoji]}" role="img" aria-label="{alt}" style="width: {actual_size}px; height: {actual_size}px;"></span>'
 
+@lru_cache(maxsize=None)
 def get_icon_markdown(emoji: str, alt: str = None) -> str:
     """Возвращает Markdown изображение для emoji."""
     icon_path = get_icon_path(emoji)
@@ -104,3 +98,12 @@ def get_icon_markdown(emoji: str, alt: str = None) -> str:
     
     return f'![{alt}]({icon_path})'
 
+
+# Размеры иконок, которые используются в интерфейсе приложения
+APP_ICON_SIZES = (20, 22, 24, 28, 32, 36)
+
+# HTML для этих размеров формируется при импорте, поэтому даже первая
+# отрисовка страницы получает готовые строки из кэша get_icon_html
+for _size in APP_ICON_SIZES:
+    for _emoji in EMOJI_TO_ICON:
+        get_icon_html(_emoji, _size)
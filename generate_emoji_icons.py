@@ -1,17 +1,21 @@
 """
 Скрипт для генерации простых иконок вместо emoji.
-Создает PNG изображения низкого разрешения для замены emoji в проекте.
+Создает SVG иконки с текстовым символом для замены emoji в проекте.
+Уже существующие файлы (например, нарисованные ``create_svg_icons.py``)
+не перезаписываются.
 """
 
-from PIL import Image, ImageDraw, ImageFont
 import os
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+
+from emoji_data import EMOJI_TO_NAME
 
 # Создаем папку для иконок
 os.makedirs("assets/icons/emoji", exist_ok=True)
 
 # Размер иконок (32x32 для низкого разрешения)
 SIZE = 32
-BG_COLOR = (255, 255, 255, 0)  # Прозрачный фон
 
 # Маппинг emoji на простые символы/текст для иконок
 EMOJI_ICONS = {
@@ -51,81 +55,31 @@ EMOJI_ICONS = {
 }
 
 def create_icon(emoji, text_symbol, color, filename):
-    """Создает простую иконку с текстом/символом"""
-    # Создаем изображение с прозрачным фоном
-    img = Image.new("RGBA", (SIZE, SIZE), BG_COLOR)
-    draw = ImageDraw.Draw(img)
-    
-    # Пытаемся использовать системный шрифт
-    try:
-        # Для Windows
-        font = ImageFont.truetype("arial.ttf", 20)
-    except:
-        try:
-            # Для Linux/Mac
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 20)
-        except:
-            # Fallback на стандартный шрифт
-            font = ImageFont.load_default()
-    
-    # Получаем размер текста
-    bbox = draw.textbbox((0, 0), text_symbol, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-    
-    # Центрируем текст
-    x = (SIZE - text_width) // 2
-    y = (SIZE - text_height) // 2 - 2
-    
-    # Рисуем текст
-    draw.text((x, y), text_symbol, fill=color, font=font)
-    
-    # Сохраняем
-    img.save(filename, "PNG")
+    """Создает простую SVG иконку с текстом/символом"""
+    if os.path.exists(filename):
+        print(f"Skipped (exists): {filename}")
+        return
+    fill = "#{:02X}{:02X}{:02X}".format(*color)
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{SIZE}" height="{SIZE}" viewBox="0 0 {SIZE} {SIZE}">'
+        f'<text x="16" y="22" font-size="20" text-anchor="middle" fill="{fill}">{escape(text_symbol)}</text>'
+        f'</svg>'
+    )
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(svg)
     print(f"Created: {filename}")
 
+def _render_one(item):
+    """Создает иконку для одной пары (emoji, (символ, цвет))"""
+    emoji, (symbol, color) = item
+    filename = f"assets/icons/emoji/{EMOJI_TO_NAME.get(emoji, 'icon')}.svg"
+    create_icon(emoji, symbol, color, filename)
+
 def main():
     """Генерирует все иконки"""
-    for emoji, (symbol, color) in EMOJI_ICONS.items():
-        # Создаем имя файла на основе emoji
-        emoji_name_map = {
-            "📊": "chart",
-            "⚙️": "settings",
-            "✅": "checkmark",
-            "❌": "cross",
-            "📦": "package",
-            "💸": "money",
-            "🚫": "prohibited",
-            "🔄": "refresh",
-            "🧾": "receipt",
-            "💾": "save",
-            "📝": "memo",
-            "📄": "document",
-            "ℹ️": "info",
-            "📌": "pin",
-            "🚚": "truck",
-            "📍": "location",
-            "🛢️": "oil_barrel",
-            "🏠": "house",
-            "⬇️": "download",
-            "🚀": "rocket",
-            "📁": "folder",
-            "🛠": "tools",
-            "🎯": "target",
-            "📋": "clipboard",
-            "⚠️": "warning",
-            "📈": "chart_up",
-            "🔒": "lock",
-            "🎨": "paintbrush",
-            "📱": "mobile",
-            "📞": "phone",
-            "📑": "pdf",
-            "⏳": "clock",
-            "🚨": "alarm",
-        }
-        
-        filename = f"assets/icons/emoji/{emoji_name_map.get(emoji, 'icon')}.png"
-        create_icon(emoji, symbol, color, filename)
+    # Иконки независимы друг от друга, поэтому записываются параллельно
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(_render_one, EMOJI_ICONS.items()))
     
     print("\nВсе иконки созданы!")
 
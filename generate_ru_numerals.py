@@ -0,0 +1,31 @@
+"""
+Скрипт для генерации таблицы чисел прописью ``json/ru_numerals.json``.
+
+Таблица используется ``generator_utils`` вместо вызова ``num2words`` для
+часто встречающихся значений: тоннажа (0–1000) и цен, кратных 100.
+Перезапустите скрипт при изменении диапазонов.
+"""
+
+import json
+import os
+
+from num2words import num2words
+
+# Диапазоны значений, для которых заранее строится таблица
+TONS_RANGE = range(0, 1001)
+PRICES_RANGE = range(1000, 150001, 100)
+
+OUTPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "json", "ru_numerals.json")
+
+
+def main():
+    """Генерирует таблицу и сохраняет её в JSON."""
+    numbers = sorted(set(TONS_RANGE) | set(PRICES_RANGE))
+    table = {str(n): num2words(n, lang="ru") for n in numbers}
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, indent=0)
+    print(f"Создан файл {OUTPUT_FILE}: {len(table)} значений")
+
+
+if __name__ == "__main__":
+    main()
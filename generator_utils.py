@@ -15,12 +15,12 @@ import os
 import io
 import json
 import datetime
-from typing import Tuple, Optional
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Tuple, Optional
 
-from docxtpl import DocxTemplate
-from num2words import num2words
-
-from data_utils import load_dictionaries
+from data_utils import BASE_DIR, load_dictionaries, load_json_dict
 
 
 # -- Базисы (условия передачи товара)
@@ -30,17 +30,87 @@ BASISES = {
     "нефтебаза": "франко-автотранспортное средство Покупателя на складе Поставщика."
 }
 
-# -- Названия месяцев в различных падежах
-MONTHS_GENITIVE = {
-    1: 'января', 2: 'февраля', 3: 'марта', 4: 'апреля', 5: 'мая', 6: 'июня',
-    7: 'июля', 8: 'августа', 9: 'сентября', 10: 'октября', 11: 'ноября', 12: 'декабря'
-}
-MONTHS_PREPOSITIONAL = {
-    1: 'январе', 2: 'феврале', 3: 'марте', 4: 'апреле', 5: 'мае', 6: 'июне',
-    7: 'июле', 8: 'августе', 9: 'сентябре', 10: 'октябре', 11: 'ноябре', 12: 'декабре'
+# -- Названия месяцев в различных падежах (индекс совпадает с номером месяца)
+MONTHS_GENITIVE = (
+    None, 'января', 'февраля', 'марта', 'апреля', 'мая', 'июня',
+    'июля', 'августа', 'сентября', 'октября', 'ноября', 'декабря'
+)
+MONTHS_PREPOSITIONAL = (
+    None, 'январе', 'феврале', 'марте', 'апреле', 'мае', 'июне',
+    'июле', 'августе', 'сентябре', 'октябре', 'ноябре', 'декабре'
+)
+
+# -- Виды документов: файлы шаблонов {вид}.docx лежат в корне проекта
+DOCUMENT_TYPES = ("prepayment", "deferment_pay")
+
+# -- Наибольшее число процессов для пакетной генерации: каждый процесс
+# заново импортирует pandas и docxtpl и держит свою копию словарей
+MAX_BATCH_WORKERS = 4
+
+# -- Таблица замены разделителя разрядов: 60,500 -> 60 500
+_THOUSANDS_TO_SPACE = str.maketrans(',', ' ')
+
+# -- Заранее подготовленные числа прописью (см. generate_ru_numerals.py)
+_NUM_WORDS = {
+    int(k): v for k, v in load_json_dict(
+        os.path.join(BASE_DIR, 'json', 'ru_numerals.json')
+    ).items()
 }
 
 
+@lru_cache(maxsize=4096)
+def _num2words_ru(number: int) -> str:
+    """Возвращает число прописью на русском языке (с кэшированием).
+
+    Сначала ищет значение в таблице ``_NUM_WORDS``, при промахе
+    вызывает ``num2words``. Библиотека импортируется только при первом
+    промахе: для типичных значений её загрузка не нужна.
+    """
+    words = _NUM_WORDS.get(number)
+    if words is None:
+        from num2words import num2words
+        words = num2words(number, lang='ru')
+    return words
+
+
+@lru_cache(maxsize=32)
+def _format_document_date(day: int, month: int, year: int) -> str:
+    """Возвращает дату документа в виде «15» октября 2025г."""
+    return f"«{day}» {MONTHS_GENITIVE[month]} {year}г."
+
+
+@lru_cache(maxsize=32)
+def _format_delivery_month(month: int, year: int) -> str:
+    """Возвращает месяц поставки в виде «в октябре 2025 г.»."""
+    return f"в {MONTHS_PREPOSITIONAL[month]} {year} г."
+
+
+def _open_template(template_bytes: bytes):
+    """Создаёт ``DocxTemplate`` из байтов шаблона.
+
+    docxtpl (вместе с python-docx, lxml и jinja2) импортируется при первом
+    вызове, а не при импорте модуля: так запуск приложения не ждёт ~70 мс,
+    и импорт выполняется в фоновом прогреве (``warm_caches``).
+    """
+    from docxtpl import DocxTemplate
+    return DocxTemplate(io.BytesIO(template_bytes))
+
+
+@lru_cache(maxsize=8)
+def _read_template_bytes(template_path: str, mtime: float) -> bytes:
+    """Читает файл шаблона Word и кэширует его содержимое.
+
+    Время изменения файла входит в ключ кэша, поэтому отредактированный
+    шаблон будет перечитан. ``DocxTemplate`` изменяет своё состояние при
+    рендеринге, поэтому кэшируются байты, а не сам объект шаблона.
+    Разбор docx из памяти занимает ~2 мс из ~25 мс генерации (основное
+    время — render и save), так что копия заранее разобранного шаблона
+    (``copy.deepcopy``) почти ничего не даёт.
+    """
+    with open(template_path, 'rb') as f:
+        return f.read()
+
+
 def generate_document(
     dop_num: str,
     client_key: str,
@@ -53,7 +123,8 @@ def generate_document(
     delivery_address: Optional[str] = None,
     neftebaza_location: Optional[str] = None,
     document_type: str = "prepayment",
-    base_dir: Optional[str] = None
+    base_dir: Optional[str] = None,
+    dictionaries: Optional[Tuple[dict, dict, dict, dict]] = None
 ) -> Tuple[Optional[bytes], Optional[bytes], Optional[str], Optional[str]]:
     """Генерирует документ Word на основе шаблона и входных данных.
 
@@ -70,6 +141,8 @@ def generate_document(
         neftebaza_location: название нефтебазы (для "нефтебаза").
         document_type: вид шаблона ("prepayment" или "deferment_pay").
         base_dir: директория, относительно которой искать шаблоны и словари.
+        dictionaries: уже загруженные словари (результат ``load_dictionaries``);
+            если не переданы, загружаются из ``base_dir``.
 
     Returns:
         tuple(docx_data, pdf_data, filename_base, error_message):
@@ -79,14 +152,28 @@ def generate_document(
             error_message — текст ошибки или None при успехе.
     """
     try:
-        # Загружаем словари
-        clients, products, locations, neftebazy = load_dictionaries(base_dir)
-        # Определяем шаблон
+        # Числа проверяем до обращения к диску: при ошибке ввода словари
+        # и шаблон не нужны
+        try:
+            tons = int(tons_str)
+            price = int(price_str)
+        except ValueError:
+            return None, None, None, "Ошибка: количество тонн и цена должны быть целыми числами."
+        # Загружаем словари (если вызывающий код не передал их сам)
+        if dictionaries is None:
+            dictionaries = load_dictionaries(base_dir)
+        clients, products, locations, neftebazy = dictionaries
+        # Определяем шаблон. Вид документа может прийти из CSV, поэтому
+        # принимаются только известные значения — иначе строка вида
+        # '../имя' открыла бы произвольный .docx относительно base_dir
+        if document_type not in DOCUMENT_TYPES:
+            return None, None, None, f"Ошибка: неизвестный вид документа '{document_type}'."
         template_filename = f"{document_type}.docx"
-        if base_dir is None:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-        template_path = os.path.join(base_dir, template_filename)
-        if not os.path.exists(template_path):
+        template_path = os.path.join(BASE_DIR if base_dir is None else base_dir, template_filename)
+        # Один stat вместо exists + getmtime: время изменения нужно для кэша
+        try:
+            template_mtime = os.path.getmtime(template_path)
+        except OSError:
             return None, None, None, f"Ошибка: шаблон '{template_filename}' не найден."
         # Проверяем наличие данных в словарях
         client_data = clients.get(client_key.lower())
@@ -105,7 +192,7 @@ def generate_document(
                 if not location_full:
                     errors.append(f"адрес '{pickup_location}'")
                 basis_full = BASISES["самовывоз"]
-                location_display_name = pickup_location.capitalize()
+                filename_suffix = f"{pickup_location.capitalize()} Самовывоз"
         elif delivery_method == "нефтебаза":
             if not neftebaza_location:
                 errors.append("не выбрана нефтебаза")
@@ -114,61 +201,131 @@ def generate_document(
                 if not location_full:
                     errors.append(f"нефтебаза '{neftebaza_location}'")
                 basis_full = BASISES["нефтебаза"]
-                location_display_name = "Нефтебаза"
+                filename_suffix = "Нефтебаза"
         else:  # доставка
             if not delivery_address or not delivery_address.strip():
                 errors.append("не указан адрес доставки")
             else:
                 location_full = delivery_address.strip()
                 basis_full = BASISES["доставка"]
-                location_display_name = "Доставка"
+                filename_suffix = "Доставка"
         if errors:
             return None, None, None, f"Ошибка: не найдены данные для: {', '.join(errors)}."
-        # Преобразуем числовые значения
-        try:
-            tons = int(tons_str)
-            price = int(price_str)
-        except ValueError:
-            return None, None, None, "Ошибка: количество тонн и цена должны быть целыми числами."
         # Формируем дату текущую
-        now = datetime.datetime.now()
-        current_date = f"«{now.day}» {MONTHS_GENITIVE[now.month]} {now.year}г."
+        now = datetime.date.today()
+        current_date = _format_document_date(now.day, now.month, now.year)
         # Формируем строку месяца оплаты
-        delivery_month = f"в {MONTHS_PREPOSITIONAL[pay_date.month]} {pay_date.year} г."
-        # Контекст шаблона
+        delivery_month = _format_delivery_month(pay_date.month, pay_date.year)
+        # Контекст шаблона. Поля клиента (contract, company_name,
+        # director_position, director_fio, initials) совпадают с именами
+        # переменных шаблона и подставляются распаковкой словаря целиком
         context = {
+            **client_data,
             'dop_num': dop_num,
-            'contract': client_data.get('contract'),
             'current_date': current_date,
-            'company_name': client_data.get('company_name'),
-            'director_position': client_data.get('director_position'),
-            'director_fio': client_data.get('director_fio'),
             'delivery_month_year': delivery_month,
             'product_name': product_name,
-            'tons_full': f"{tons} ({num2words(tons, lang='ru')})",
-            'price_full': f"{price:,} ({num2words(price, lang='ru')})".replace(',', ' '),
+            'tons_full': f"{tons} ({_num2words_ru(tons)})",
+            'price_full': f"{f'{price:,}'.translate(_THOUSANDS_TO_SPACE)} ({_num2words_ru(price)})",
             'basis_full': basis_full,
             'location_full': location_full,
             'pay_date': pay_date.strftime('%d.%m.%Y'),
-            'initials': client_data.get('initials'),
         }
         # Генерируем документ
-        doc = DocxTemplate(template_path)
+        template_bytes = _read_template_bytes(template_path, template_mtime)
+        doc = _open_template(template_bytes)
         doc.render(context)
-        # Имя файла
-        product_display = product_key.upper()
-        if delivery_method == "самовывоз":
-            filename_base = f"Дополнительное соглашение №{dop_num} {product_display} {location_display_name} Самовывоз"
-        elif delivery_method == "нефтебаза":
-            filename_base = f"Дополнительное соглашение №{dop_num} {product_display} Нефтебаза"
-        else:
-            filename_base = f"Дополнительное соглашение №{dop_num} {product_display} Доставка"
+        # Имя файла (окончание выбрано вместе с базисом выше)
+        filename_base = f"Дополнительное соглашение №{dop_num} {product_key.upper()} {filename_suffix}"
         # Сохраняем DOCX в байтовый буфер
         docx_buffer = io.BytesIO()
         doc.save(docx_buffer)
+        # getvalue() отдаёт внутренний буфер BytesIO без копирования, а
+        # st.download_button в любом случае принимает данные как bytes
         docx_data = docx_buffer.getvalue()
-        docx_buffer.close()
         # PDF не используется в Streamlit версии
         return docx_data, None, filename_base, None
     except Exception as exc:
-        return None, None, None, f"Неизвестная ошибка: {exc}"
\ No newline at end of file
+        return None, None, None, f"Неизвестная ошибка: {exc}"
+
+
+def warm_caches(base_dir: Optional[str] = None) -> None:
+    """Заранее заполняет кэши словарей и шаблонов.
+
+    Загружает словари, читает оба шаблона и один раз рендерит каждый с
+    пустым контекстом (прогревает jinja2 и lxml), чтобы первый запрос
+    пользователя не платил за холодный старт. Ошибки игнорируются: при
+    генерации они будут показаны обычным образом.
+    """
+    load_dictionaries(base_dir)
+    root = BASE_DIR if base_dir is None else base_dir
+    for document_type in DOCUMENT_TYPES:
+        template_path = os.path.join(root, f"{document_type}.docx")
+        try:
+            template_bytes = _read_template_bytes(template_path, os.path.getmtime(template_path))
+            doc = _open_template(template_bytes)
+            doc.render({})
+            doc.save(io.BytesIO())
+        except Exception:
+            continue
+
+
+def _generate_from_kwargs(kwargs: Dict[str, Any]) -> Tuple[Optional[bytes], Optional[bytes], Optional[str], Optional[str]]:
+    """Вызывает ``generate_document`` с аргументами из словаря (для пула процессов)."""
+    return generate_document(**kwargs)
+
+
+def generate_documents_batch(
+    rows: List[Dict[str, Any]],
+    max_workers: Optional[int] = None
+) -> Iterator[Tuple[int, Tuple[Optional[bytes], Optional[bytes], Optional[str], Optional[str]]]]:
+    """Генерирует несколько документов параллельно в отдельных процессах.
+
+    Рендеринг шаблона упирается в процессор и GIL, поэтому документы
+    распределяются по процессам. Словари и шаблоны каждый процесс кэширует
+    сам (``load_dictionaries``, ``_read_template_bytes``). Если процесс
+    нужен всего один, документы рендерятся в текущем процессе.
+
+    Args:
+        rows: список словарей с аргументами ``generate_document``.
+        max_workers: число процессов; по умолчанию — не больше числа
+            документов, числа ядер и ``MAX_BATCH_WORKERS``.
+
+    Yields:
+        tuple(int, tuple): индекс строки в ``rows`` и результат
+            ``generate_document`` — по мере готовности документов.
+    """
+    if not rows:
+        return
+    if max_workers is None:
+        max_workers = min(len(rows), os.cpu_count() or 1, MAX_BATCH_WORKERS)
+    if max_workers <= 1:
+        # Один процесс (одна строка или одно ядро): запуск пула только
+        # добавил бы накладные расходы — рендерим здесь же, загрузив
+        # словари один раз на всю пачку
+        dictionaries_by_dir: Dict[Optional[str], Tuple[dict, dict, dict, dict]] = {}
+        for index, row in enumerate(rows):
+            try:
+                base_dir = row.get("base_dir")
+                if base_dir not in dictionaries_by_dir:
+                    dictionaries_by_dir[base_dir] = load_dictionaries(base_dir)
+                result = generate_document(**{"dictionaries": dictionaries_by_dir[base_dir], **row})
+            except Exception as exc:
+                result = (None, None, None, f"Неизвестная ошибка: {exc}")
+            yield index, result
+        return
+    # Процессы запускаются через spawn: fork внутри многопоточного сервера
+    # Streamlit может унаследовать захваченные другими потоками блокировки
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = {executor.submit(_generate_from_kwargs, row): i for i, row in enumerate(rows)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                # Например, неверные аргументы в строке: остальные документы
+                # генерируются дальше
+                result = (None, None, None, f"Неизвестная ошибка: {exc}")
+            yield index, result
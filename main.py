@@ -11,20 +11,337 @@
 
 from __future__ import annotations
 
+import csv
 import datetime
+import io
+import re
+import threading
+import zipfile
+
 import streamlit as st
 
-from generator_utils import generate_document, BASISES
+from generator_utils import DOCUMENT_TYPES, generate_document, generate_documents_batch, warm_caches
 from data_utils import load_dictionaries
 from dashboard import display_dashboard
-from emoji_icons import get_icon_html
+from emoji_icons import get_icon_html, get_icon_stylesheet
+
+
+# Поля ввода «компания,номер» и «продукт,количество,цена»: одно регулярное
+# выражение проверяет число частей и сразу отделяет их от пробелов
+_COMP_INPUT_RE = re.compile(r"\s*([^,]*?)\s*,\s*([^,]*?)\s*")
+_PROD_INPUT_RE = re.compile(r"\s*([^,]*?)\s*,\s*([^,]*?)\s*,\s*([^,]*?)\s*")
+
+
+@st.cache_resource
+def _start_warm_up() -> threading.Thread:
+    """Один раз на процесс запускает прогрев словарей и шаблонов в фоновом потоке.
+
+    Генерация документов окончания прогрева не ждёт: при холодном кэше
+    она сама загрузит словари и шаблон.
+    """
+    thread = threading.Thread(target=warm_caches, name="docgen-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_data(show_spinner=False)
+def _bullet_list(d: dict) -> str:
+    """Возвращает отсортированные ключи словаря списком «• ключ» по строкам.
+
+    Список выводится одним ``st.text`` вместо отдельного элемента на каждый
+    ключ; результат кэшируется между перезапусками.
+    """
+    return "\n".join(f"• {key}" for key in sorted(d.keys()))
+
+
+# Столбцы CSV для пакетной генерации. В столбце place указывается базис
+# (самовывоз), нефтебаза или адрес доставки — в зависимости от способа
+BATCH_COLUMNS = ("dop_num", "client", "product", "tons", "price", "pay_date", "delivery_method", "place")
+_PLACE_ARGUMENT = {
+    "самовывоз": "pickup_location",
+    "нефтебаза": "neftebaza_location",
+    "доставка": "delivery_address",
+}
+
+
+# Символы, допустимые в именах файлов внутри ZIP; остальные (в том числе
+# разделители путей / и \\) заменяются на «_», так что имя не может
+# указывать на другой каталог
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r"[^\w №.,()\-]")
+
+
+def _zip_entry_name(filename_base: str, used: set) -> str:
+    """Возвращает безопасное и уникальное в архиве имя файла ``.doc``.
+
+    Имя собирается из полей CSV (номер ДС, базис), поэтому из него
+    убираются разделители путей и прочие посторонние символы, а совпавшие
+    имена получают номер: «… (2).doc».
+    """
+    base = _UNSAFE_FILENAME_CHARS_RE.sub("_", filename_base).strip(" .") or "документ"
+    name = f"{base}.doc"
+    counter = 2
+    while name in used:
+        name = f"{base} ({counter}).doc"
+        counter += 1
+    used.add(name)
+    return name
+
+
+def _parse_ddmmyyyy(value: str) -> datetime.date:
+    """Разбирает дату вида ДД.ММ.ГГГГ (день и месяц могут быть из одной цифры).
+
+    Формат фиксированный, поэтому строка просто делится по точкам вместо
+    разбора шаблона в ``strptime``.
+
+    Raises:
+        ValueError: если строка не является датой в этом формате.
+    """
+    parts = value.split(".")
+    if len(parts) != 3 or len(parts[2]) != 4 or not all(p.isdigit() for p in parts):
+        raise ValueError(value)
+    day, month, year = map(int, parts)
+    return datetime.date(year, month, day)
+
+
+def _batch_rows_from_csv(data: bytes) -> list:
+    """Разбирает CSV для пакетной генерации в список аргументов ``generate_document``.
+
+    Разделитель (``,`` или ``;``) определяется автоматически. Необязательный
+    столбец ``document_type`` по умолчанию равен ``prepayment``.
+
+    Raises:
+        ValueError: если нет нужных столбцов или строка заполнена неверно.
+    """
+    text = data.decode("utf-8-sig")
+    try:
+        dialect = csv.Sniffer().sniff(text.split("\n", 1)[0], delimiters=",;")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+    missing = [col for col in BATCH_COLUMNS if col not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"в CSV нет столбцов: {', '.join(missing)}")
+    rows = []
+    # Нумерация строк как в табличном редакторе: первая строка — заголовок
+    for line_no, record in enumerate(reader, start=2):
+        # В коротких строках недостающие ячейки равны None
+        cells = {key: (value or "").strip() for key, value in record.items() if key}
+        method = cells["delivery_method"].lower()
+        if method not in _PLACE_ARGUMENT:
+            raise ValueError(f"строка {line_no}: неизвестный способ доставки '{cells['delivery_method']}'")
+        try:
+            pay_date = _parse_ddmmyyyy(cells["pay_date"])
+        except ValueError:
+            raise ValueError(f"строка {line_no}: дата оплаты должна быть в формате ДД.ММ.ГГГГ")
+        rows.append({
+            "dop_num": cells["dop_num"],
+            "client_key": cells["client"],
+            "product_key": cells["product"],
+            "tons_str": cells["tons"],
+            "price_str": cells["price"],
+            "pay_date": pay_date,
+            "delivery_method": method,
+            _PLACE_ARGUMENT[method]: cells["place"],
+            "document_type": cells.get("document_type") or "prepayment",
+        })
+    return rows
+
+
+@st.fragment
+def _render_batch_generation() -> None:
+    """Блок пакетной генерации: CSV на входе, ZIP с документами на выходе.
+
+    Как и форма, выполняется фрагментом: загрузка файла не перезапускает
+    остальную страницу.
+    """
+    with st.expander("Пакетная генерация из CSV"):
+        st.caption(
+            "Столбцы: " + ", ".join(BATCH_COLUMNS) + " и необязательный document_type "
+            "(prepayment или deferment_pay). Дата оплаты — ДД.ММ.ГГГГ, в place — базис, "
+            "нефтебаза или адрес доставки."
+        )
+        batch_file = st.file_uploader("CSV‑файл", type=["csv"], key="batch_csv")
+        if batch_file is None or not st.button("Сгенерировать пакет"):
+            return
+        try:
+            rows = _batch_rows_from_csv(batch_file.getvalue())
+        except (UnicodeDecodeError, ValueError) as exc:
+            st.error(f"Ошибка в CSV: {exc}")
+            return
+        if not rows:
+            st.warning("В CSV нет строк с данными")
+            return
+        progress = st.progress(0.0, text="Генерация документов…")
+        errors = []
+        names = set()
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+            # Документы рендерятся в отдельных процессах и приходят по мере готовности
+            for done, (index, (docx_data, _, filename_base, err)) in enumerate(
+                generate_documents_batch(rows), start=1
+            ):
+                if err:
+                    errors.append((index, err))
+                else:
+                    zf.writestr(_zip_entry_name(filename_base, names), docx_data)
+                progress.progress(done / len(rows), text=f"Готово {done} из {len(rows)}")
+        for index, err in sorted(errors):
+            st.error(f"Строка {index + 2}: {err}")
+        if names:
+            st.success(f"Создано документов: {len(names)} из {len(rows)}")
+            st.download_button(
+                label="Скачать ZIP",
+                data=zip_buffer.getvalue(),
+                file_name="Дополнительные соглашения.zip",
+                mime="application/zip",
+            )
+
+
+@st.fragment
+def _render_generator_form(clients: dict, products: dict, locations: dict, neftebazy: dict) -> None:
+    """Форма генерации одного документа.
+
+    Выполняется как фрагмент: изменение полей формы перезапускает только
+    её, а не всё приложение вместе со вкладкой дашборда. Поля, зависящие
+    от способа доставки, при этом обновляются сразу (в отличие от st.form).
+    """
+    st.markdown(f"### {get_icon_html('📌', 24)} Основные параметры", unsafe_allow_html=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        document_type = st.radio(
+            "Тип оплаты",
+            options=DOCUMENT_TYPES,
+            format_func=lambda x: "Предоплата" if x == "prepayment" else "Отсрочка платежа",
+            index=0,
+            horizontal=True
+        )
+    with col2:
+        pay_date = st.date_input(
+            "Дата оплаты",
+            value=datetime.date.today(),
+            help="Укажите плановую дату оплаты"
+        )
+    st.markdown(f"### {get_icon_html('🚚', 24)} Способ доставки", unsafe_allow_html=True)
+    delivery_method = st.radio(
+        "Способ доставки",
+        options=["самовывоз", "доставка", "нефтебаза"],
+        format_func=lambda x: {"самовывоз": "Самовывоз", "доставка": "Доставка", "нефтебаза": "Нефтебаза"}[x],
+        index=0,
+        horizontal=True
+    )
+    pickup_location = None
+    delivery_address = None
+    neftebaza_location = None
+    if delivery_method == "самовывоз":
+        st.markdown(f"#### {get_icon_html('📍', 22)} Выбор базиса для самовывоза", unsafe_allow_html=True)
+        if locations:
+            pickup_location = st.selectbox(
+                "Базис",
+                options=list(locations.keys()),
+                format_func=str.upper,
+            )
+        else:
+            st.error("Не найдены базисы в файле locations.json")
+    elif delivery_method == "нефтебаза":
+        st.markdown(f"#### {get_icon_html('🛢️', 22)} Выбор нефтебазы", unsafe_allow_html=True)
+        if neftebazy:
+            neftebaza_location = st.selectbox(
+                "Нефтебаза",
+                options=list(neftebazy.keys()),
+                format_func=str.upper,
+            )
+        else:
+            st.error("Не найдены нефтебазы в файле nb.json")
+    else:
+        st.markdown(f"#### {get_icon_html('🏠', 22)} Адрес доставки", unsafe_allow_html=True)
+        delivery_address = st.text_input(
+            "Адрес доставки",
+            placeholder="Например: г. Казань, ул. Абсалямова, 19"
+        )
+    st.markdown(f"### {get_icon_html('📝', 24)} Ввод данных", unsafe_allow_html=True)
+    col3, col4 = st.columns(2)
+    with col3:
+        comp_input = st.text_input(
+            "Компания, номер ДС",
+            placeholder="Например: деко,212",
+            help="Формат: компания,номер_дс"
+        )
+    with col4:
+        prod_input = st.text_input(
+            "Продукт, количество, цена",
+            placeholder="Например: дтл,25,60500",
+            help="Формат: товар,количество,цена"
+        )
+    # Кнопка генерации
+    if st.button("Сгенерировать", type="primary"):
+        # Валидируем ввод
+        if not comp_input or not prod_input:
+            st.error("Пожалуйста, заполните все поля")
+        elif delivery_method == "доставка" and (not delivery_address or not delivery_address.strip()):
+            st.error("Укажите адрес доставки")
+        elif delivery_method == "самовывоз" and not pickup_location:
+            st.error("Выберите базис для самовывоза")
+        elif delivery_method == "нефтебаза" and not neftebaza_location:
+            st.error("Выберите нефтебазу")
+        else:
+            try:
+                comp_match = _COMP_INPUT_RE.fullmatch(comp_input)
+                prod_match = _PROD_INPUT_RE.fullmatch(prod_input)
+                if not comp_match:
+                    st.error("Неверный формат компании. Используйте формат: компания,номер")
+                elif not prod_match:
+                    st.error("Неверный формат продукта. Используйте формат: продукт,количество,цена")
+                else:
+                    client_key, dop_num = comp_match.groups()
+                    product_key, tons_str, price_str = prod_match.groups()
+                    with st.spinner("Генерация документа..."):
+                        docx_data, _, filename_base, err = generate_document(
+                            dop_num=dop_num,
+                            client_key=client_key,
+                            product_key=product_key,
+                            price_str=price_str,
+                            tons_str=tons_str,
+                            pay_date=pay_date,
+                            delivery_method=delivery_method,
+                            pickup_location=pickup_location,
+                            delivery_address=delivery_address,
+                            neftebaza_location=neftebaza_location,
+                            document_type=document_type,
+                            base_dir=None,
+                            dictionaries=(clients, products, locations, neftebazy),
+                        )
+                    if err:
+                        st.error(err)
+                    else:
+                        st.success("Документ успешно создан!")
+                        if docx_data:
+                            st.download_button(
+                                label="Скачать DOC",
+                                data=docx_data,
+                                file_name=f"{filename_base}.doc",
+                                mime="application/msword",
+                            )
+                        st.info(f"Способ доставки: {delivery_method}")
+                        if delivery_method == "самовывоз":
+                            st.info(f"Базис: {pickup_location}")
+                        elif delivery_method == "нефтебаза":
+                            st.info(f"Нефтебаза: {neftebaza_location}")
+                        else:
+                            st.info(f"Адрес: {delivery_address}")
+                        st.info(f"Дата оплаты: {pay_date.strftime('%d.%m.%Y')}")
+                        st.info(f"Имя файла: {filename_base}.doc")
+            except Exception as exc:
+                st.error(f"Ошибка при генерации: {exc}")
 
 
 def run_app() -> None:
     """Запускает веб‑приложение Streamlit."""
     # Настройки страницы
     st.set_page_config(page_title="Генератор доп. соглашений", layout="wide")
+    # Прогрев кэшей идёт в фоне, пока отрисовывается страница
+    _start_warm_up()
     # Инъекция пользовательских стилей (общих для всего приложения)
+    st.markdown(get_icon_stylesheet(), unsafe_allow_html=True)
     # Заголовок
     st.markdown(f"""<h1 style='text-align:center;'>{get_icon_html('📝', 36)} Сервис для работы с договорами</h1>""", unsafe_allow_html=True)
     st.markdown("""<p style='text-align:center;color:gray;'>Создавайте дополнительные соглашения и анализируйте сделки в одном месте</p>""", unsafe_allow_html=True)
@@ -41,147 +358,19 @@ def run_app() -> None:
             st.markdown(f"## {get_icon_html('ℹ️', 28)} Справка", unsafe_allow_html=True)
             if clients:
                 st.subheader("Компании")
-                for key in sorted(clients.keys()):
-                    st.text(f"• {key}")
+                st.text(_bullet_list(clients))
             if products:
                 st.subheader("Продукты")
-                for key in sorted(products.keys()):
-                    st.text(f"• {key}")
+                st.text(_bullet_list(products))
             if locations:
                 st.subheader("Базисы самовывоза")
-                for key in sorted(locations.keys()):
-                    st.text(f"• {key}")
+                st.text(_bullet_list(locations))
             if neftebazy:
                 st.subheader("Нефтебазы")
-                for key in sorted(neftebazy.keys()):
-                    st.text(f"• {key}")
+                st.text(_bullet_list(neftebazy))
         # Форма генерации
-        st.markdown(f"### {get_icon_html('📌', 24)} Основные параметры", unsafe_allow_html=True)
-        col1, col2 = st.columns(2)
-        with col1:
-            document_type = st.radio(
-                "Тип оплаты",
-                options=["prepayment", "deferment_pay"],
-                format_func=lambda x: "Предоплата" if x == "prepayment" else "Отсрочка платежа",
-                index=0,
-                horizontal=True
-            )
-        with col2:
-            pay_date = st.date_input(
-                "Дата оплаты",
-                value=datetime.date.today(),
-                help="Укажите плановую дату оплаты"
-            )
-        st.markdown(f"### {get_icon_html('🚚', 24)} Способ доставки", unsafe_allow_html=True)
-        delivery_method = st.radio(
-            "Способ доставки",
-            options=["самовывоз", "доставка", "нефтебаза"],
-            format_func=lambda x: {"самовывоз": "Самовывоз", "доставка": "Доставка", "нефтебаза": "Нефтебаза"}[x],
-            index=0,
-            horizontal=True
-        )
-        pickup_location = None
-        delivery_address = None
-        neftebaza_location = None
-        if delivery_method == "самовывоз":
-            st.markdown(f"#### {get_icon_html('📍', 22)} Выбор базиса для самовывоза", unsafe_allow_html=True)
-            if locations:
-                pickup_location = st.selectbox(
-                    "Базис",
-                    options=list(locations.keys()),
-                    format_func=str.upper,
-                )
-            else:
-                st.error("Не найдены базисы в файле locations.json")
-        elif delivery_method == "нефтебаза":
-            st.markdown(f"#### {get_icon_html('🛢️', 22)} Выбор нефтебазы", unsafe_allow_html=True)
-            if neftebazy:
-                neftebaza_location = st.selectbox(
-                    "Нефтебаза",
-                    options=list(neftebazy.keys()),
-                    format_func=str.upper,
-                )
-            else:
-                st.error("Не найдены нефтебазы в файле nb.json")
-        else:
-            st.markdown(f"#### {get_icon_html('🏠', 22)} Адрес доставки", unsafe_allow_html=True)
-            delivery_address = st.text_input(
-                "Адрес доставки",
-                placeholder="Например: г. Казань, ул. Абсалямова, 19"
-            )
-        st.markdown(f"### {get_icon_html('📝', 24)} Ввод данных", unsafe_allow_html=True)
-        col3, col4 = st.columns(2)
-        with col3:
-            comp_input = st.text_input(
-                "Компания, номер ДС",
-                placeholder="Например: деко,212",
-                help="Формат: компания,номер_дс"
-            )
-        with col4:
-            prod_input = st.text_input(
-                "Продукт, количество, цена",
-                placeholder="Например: дтл,25,60500",
-                help="Формат: товар,количество,цена"
-            )
-        # Кнопка генерации
-        if st.button("Сгенерировать", type="primary"):
-            # Валидируем ввод
-            if not comp_input or not prod_input:
-                st.error("Пожалуйста, заполните все поля")
-            elif delivery_method == "доставка" and (not delivery_address or not delivery_address.strip()):
-                st.error("Укажите адрес доставки")
-            elif delivery_method == "самовывоз" and not pickup_location:
-                st.error("Выберите базис для самовывоза")
-            elif delivery_method == "нефтебаза" and not neftebaza_location:
-                st.error("Выберите нефтебазу")
-            else:
-                try:
-                    comp_parts = [p.strip() for p in comp_input.split(',')]
-                    prod_parts = [p.strip() for p in prod_input.split(',')]
-                    if len(comp_parts) != 2:
-                        st.error("Неверный формат компании. Используйте формат: компания,номер")
-                    elif len(prod_parts) != 3:
-                        st.error("Неверный формат продукта. Используйте формат: продукт,количество,цена")
-                    else:
-                        client_key, dop_num = comp_parts
-                        product_key, tons_str, price_str = prod_parts
-                        with st.spinner("Генерация документа..."):
-                            docx_data, _, filename_base, err = generate_document(
-                                dop_num=dop_num,
-                                client_key=client_key,
-                                product_key=product_key,
-                                price_str=price_str,
-                                tons_str=tons_str,
-                                pay_date=pay_date,
-                                delivery_method=delivery_method,
-                                pickup_location=pickup_location,
-                                delivery_address=delivery_address,
-                                neftebaza_location=neftebaza_location,
-                                document_type=document_type,
-                                base_dir=None
-                            )
-                        if err:
-                            st.error(err)
-                        else:
-                            st.success("Документ успешно создан!")
-                            if docx_data:
-                                st.download_button(
-                                    label="Скачать DOC",
-                                    data=docx_data,
-                                    file_name=f"{filename_base}.doc",
-                                    mime="application/msword",
-                                )
-                            st.info(f"Способ доставки: {delivery_method}")
-                            if delivery_method == "самовывоз":
-                                st.info(f"Базис: {pickup_location}")
-                            elif delivery_method == "нефтебаза":
-                                st.info(f"Нефтебаза: {neftebaza_location}")
-                            else:
-                                st.info(f"Адрес: {delivery_address}")
-                            st.info(f"Дата оплаты: {pay_date.strftime('%d.%m.%Y')}")
-                            st.info(f"Имя файла: {filename_base}.doc")
-                except Exception as exc:
-                    st.error(f"Ошибка при генерации: {exc}")
+        _render_generator_form(clients, products, locations, neftebazy)
+        _render_batch_generation()
     # Вкладка дашборд
     with tab_dash:
         # Передаем идентификатор вашей Google Sheets. При необходимости можно оставить None,
@@ -5,8 +5,6 @@ import streamlit as st
 from datetime import datetime, date
 from docxtpl import DocxTemplate
 from num2words import num2words
-from docx2pdf import convert
-import tempfile
 import io
 
 # --- 1. ЗАГРУЗКА СЛОВАРЕЙ ИЗ JSON ---
@@ -43,17 +41,17 @@ BASISES = {
     "нефтебаза": "франко-автотранспортное средство Покупателя на складе Поставщика."
 }
 
-# Словарь для даты ("«25» июня") - родительный падеж
-MONTHS_GENITIVE = {
-    1: 'января', 2: 'февраля', 3: 'марта', 4: 'апреля', 5: 'мая', 6: 'июня',
-    7: 'июля', 8: 'августа', 9: 'сентября', 10: 'октября', 11: 'ноября', 12: 'декабря'
-}
+# Месяцы для даты ("«25» июня") - родительный падеж (индекс = номер месяца)
+MONTHS_GENITIVE = (
+    None, 'января', 'февраля', 'марта', 'апреля', 'мая', 'июня',
+    'июля', 'августа', 'сентября', 'октября', 'ноября', 'декабря'
+)
 
-# Словарь для срока поставки ("в июне") - предложный падеж
-MONTHS_PREPOSITIONAL = {
-    1: 'январе', 2: 'феврале', 3: 'марте', 4: 'апреле', 5: 'мае', 6: 'июне',
-    7: 'июле', 8: 'августе', 9: 'сентябре', 10: 'октябре', 11: 'ноябре', 12: 'декабре'
-}
+# Месяцы для срока поставки ("в июне") - предложный падеж (индекс = номер месяца)
+MONTHS_PREPOSITIONAL = (
+    None, 'январе', 'феврале', 'марте', 'апреле', 'мае', 'июне',
+    'июле', 'августе', 'сентябре', 'октябре', 'ноябре', 'декабре'
+)
 
 # --- 2. ФУНКЦИИ ГЕНЕРАЦИИ ДОКУМЕНТОВ ---
 
@@ -320,8 +318,10 @@ def generate_document(input_string, document_type="prepayment"):
         # Сохраняем файл (фактически это будет docx, но с расширением .doc)
         doc.save(docx_path)
         
-        # Конвертируем в PDF
+        # Конвертируем в PDF. docx2pdf импортируется только здесь: на Windows
+        # его импорт инициализирует COM и заметно замедляет запуск приложения
         try:
+            from docx2pdf import convert
             convert(docx_path, pdf_path)
         except Exception as e:
             print(f"Предупреждение: Не удалось создать PDF файл: {e}")
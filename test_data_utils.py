@@ -0,0 +1,129 @@
+"""Тесты для функций разбора листов в data_utils."""
+import datetime
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from data_utils import (
+    _EXCEL_ENGINE,
+    _lower_keys,
+    _read_month_sheet,
+    get_month_sheet_name,
+    parse_transport_table,
+    prepare_dashboard_summary,
+)
+
+openpyxl = pytest.importorskip("openpyxl")
+
+ENGINES = ["openpyxl"] + ([_EXCEL_ENGINE] if _EXCEL_ENGINE else [])
+
+
+@pytest.fixture
+def month_sheet(tmp_path):
+    """Книга с листом за октябрь 2025 в формате таблицы продаж.
+
+    Заголовок в третьей строке; в нём есть пустые и повторяющиеся ячейки,
+    числовой заголовок над целыми числами, пустой заголовок над целыми
+    числами и столбец с числами, записанными текстом.
+    """
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = get_month_sheet_name(10, 2025)
+    ws.append(["Продажи за октябрь"])
+    ws.append([None])
+    ws.append(["№", "dup", None, "dup", "кол-во отгруженного, тн", "дата", 2025, None, None])
+    ws.append([1, "деко", "x", "b", "12.5", datetime.datetime(2025, 1, 1), 5, "хвост", 7])
+    ws.append([None] * 6 + [0, None, 0])
+    ws.append([2, "сфера", None, "d", "3", None, 6, None, 8])
+    ws.append(["ТРАНСПОРТ +", None, None, None, None, None, 7, None, 9])
+    path = tmp_path / "sheet.xlsx"
+    wb.save(path)
+    return path
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_month_sheet_matches_read_excel(month_sheet, engine):
+    """Таблица за месяц совпадает с read_excel(header=2), лист без заголовков — с header=None."""
+    expected = pd.read_excel(month_sheet, header=2, engine=engine)
+    expected_raw = pd.read_excel(month_sheet, header=None, engine=engine)
+
+    with pd.ExcelFile(month_sheet, engine=engine) as excel_file:
+        df_month, df_raw, sheet = _read_month_sheet(
+            excel_file, get_month_sheet_name(10, 2025), datetime.date(2025, 10, 15)
+        )
+
+    assert sheet == get_month_sheet_name(10, 2025)
+    assert list(df_month.columns) == [
+        "№", "dup", "Unnamed: 2", "dup.1", "кол-во отгруженного, тн", "дата", 2025, "Unnamed: 7", "Unnamed: 8",
+    ]
+    assert df_month["кол-во отгруженного, тн"].dtype == "float64"
+    assert df_month[2025].dtype == "int64"
+    assert df_month["Unnamed: 8"].dtype == "int64"
+    assert_frame_equal(df_month, expected)
+    assert_frame_equal(df_raw, expected_raw)
+
+
+def test_month_sheet_falls_back_to_previous_month(month_sheet):
+    """Если листа за текущий месяц нет, читается лист за предыдущий."""
+    with pd.ExcelFile(month_sheet, engine="openpyxl") as excel_file:
+        _, _, sheet = _read_month_sheet(
+            excel_file, get_month_sheet_name(11, 2025), datetime.date(2025, 11, 3)
+        )
+
+    assert sheet == get_month_sheet_name(10, 2025)
+
+
+def _raw_sheet(rows, ncols=15):
+    """Собирает «сырой» лист (header=None) из словарей {номер столбца: значение}."""
+    return pd.DataFrame(
+        [[row.get(i) for i in range(ncols)] for row in rows], dtype=object
+    )
+
+
+def test_transport_table_blank_names():
+    """Блок «ТРАНСПОРТ +» только с пустыми именами даёт пустой словарь."""
+    raw = _raw_sheet([{0: "Компания"}, {0: "ТРАНСПОРТ +"}, {0: " ", 7: 100, 14: 5}, {0: ""}])
+
+    assert parse_transport_table(raw) == {}
+
+
+def test_transport_table_stops_at_total():
+    """Строки после «ВСЕГО»/«ИТОГО» в блок не входят; фамилия — первое слово."""
+    raw = _raw_sheet([
+        {0: "ТРАНСПОРТ +"},
+        {0: "Сулейманов Дамир", 7: 100, 14: 2.5},
+        {0: None},
+        {0: " Петров ", 7: "200", 14: 3},
+        {0: "итого", 7: 1, 14: 1},
+        {0: "Сидоров", 7: 300, 14: 1},
+    ])
+
+    assert parse_transport_table(raw) == {"сулейманов": 250.0, "петров": 600.0}
+
+
+def test_dashboard_summary_blank_drivers():
+    """Пустые ячейки водителя дают флаг «Водитель отсутствует», а не ошибку."""
+    df = pd.DataFrame({
+        "Компания": ["Деко", "деко "],
+        "Данные водителя, а/м, п/п и контактные сведения": ["   ", ""],
+        "№ доп контрагент": [1, 2],
+        "кол-во отгруженного, тн": [10, 5],
+        "Итого заработали": [100, 50],
+        "отсрочка платежа, дн": [None, None],
+        "Оплачено контрагентом": [None, None],
+    })
+
+    summary, totals = prepare_dashboard_summary(df, {"деко": {}}, {"иванов": 5.0})
+
+    assert len(summary) == 1
+    assert summary[0]["Водитель отсутствует"] is True
+    assert totals["total_transport"] == 0
+
+
+def test_lower_keys_warns_on_case_collision():
+    """Ключи, различающиеся только регистром, дают предупреждение; побеждает последний."""
+    with pytest.warns(UserWarning, match="Деко"):
+        result = _lower_keys({"Деко": 1, "сфера": 2, "деко": 3}, "clients.json")
+
+    assert result == {"деко": 3, "сфера": 2}
@@ -7,8 +7,8 @@ test_emojis = ["📊", "✅", "📦", "🔄"]
 print("Тестирование иконок:")
 for emoji in test_emojis:
     html = get_icon_html(emoji, 24)
-    if "data:image" in html:
-        print(f"✅ {emoji} - OK (base64 encoded)")
+    if 'class="emi-' in html:
+        print(f"✅ {emoji} - OK (CSS class)")
     elif emoji in html:
         print(f"⚠️  {emoji} - Fallback на emoji (файл не найден)")
     else: